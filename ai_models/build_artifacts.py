@@ -0,0 +1,172 @@
+"""
+Lok Vaani model artifact builder
+
+Resolves the hub models used by model2/model3 once, converts them to
+safetensors (plus optional int8 / ONNX variants) and writes a versioned,
+checksummed artifact tree with a manifest. The services then load only from
+that manifest with hub access disabled.
+
+Usage:
+    python build_artifacts.py --service model2 --out model2/artifacts
+    python build_artifacts.py --service model3 --out model3/artifacts --draft-model JackFram/llama-68m --quantize
+
+Layout:
+    <out>/manifest.json                 # points at the current version
+    <out>/<version>/<name>/safetensors/ # config, tokenizer, model.safetensors
+    <out>/<version>/<name>/int8/        # dynamic int8 state dict (--quantize)
+    <out>/<version>/<name>/onnx/        # ONNX export via optimum (--onnx)
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+
+from model_artifacts import sha256_file
+
+SERVICE_MODELS = {
+    "model2": {
+        "summarizer": {
+            "source": "google/flan-t5-base",
+            "model_class": "AutoModelForSeq2SeqLM",
+            "task": "text2text-generation"
+        },
+        "sentiment": {
+            "source": "cardiffnlp/twitter-roberta-base-sentiment",
+            "model_class": "AutoModelForSequenceClassification",
+            "task": "sentiment-analysis"
+        }
+    },
+    "model3": {
+        "summarizer": {
+            "source": "TinyLlama/TinyLlama-1.1B-Chat-v1.0",
+            "model_class": "AutoModelForCausalLM",
+            "task": "text-generation"
+        }
+    }
+}
+
+ONNX_CLASSES = {
+    "AutoModelForSeq2SeqLM": "ORTModelForSeq2SeqLM",
+    "AutoModelForSequenceClassification": "ORTModelForSequenceClassification",
+    "AutoModelForCausalLM": "ORTModelForCausalLM"
+}
+
+
+def checksum_dir(directory: Path) -> dict:
+    """Map each file (relative path) to its sha256 and size."""
+    return {
+        str(path.relative_to(directory)): {"sha256": sha256_file(path), "size": path.stat().st_size}
+        for path in sorted(directory.rglob("*")) if path.is_file()
+    }
+
+
+def build_model(name: str, spec: dict, target: Path, cache_dir: str, quantize: bool, onnx: bool) -> dict:
+    import torch
+    import transformers
+
+    print(f"--- Building '{name}' from {spec['source']} ---")
+    model_cls = getattr(transformers, spec["model_class"])
+    tokenizer = transformers.AutoTokenizer.from_pretrained(spec["source"], cache_dir=cache_dir)
+    model = model_cls.from_pretrained(spec["source"], cache_dir=cache_dir, low_cpu_mem_usage=True).eval()
+
+    variants = {}
+    safetensors_dir = target / "safetensors"
+    model.save_pretrained(safetensors_dir, safe_serialization=True)
+    tokenizer.save_pretrained(safetensors_dir)
+    variants["safetensors"] = {"path": str(safetensors_dir.relative_to(target.parent))}
+    print(f"✅ safetensors written to {safetensors_dir}")
+
+    if quantize:
+        int8_dir = target / "int8"
+        int8_dir.mkdir(parents=True, exist_ok=True)
+        quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        torch.save(quantized.state_dict(), int8_dir / "model_int8.pt")
+        # Services load this with weights_only=True; fail the build rather than ship a file they can't read
+        torch.load(int8_dir / "model_int8.pt", weights_only=True)
+        variants["int8"] = {"path": str(int8_dir.relative_to(target.parent)), "weights": "model_int8.pt"}
+        print(f"✅ int8 variant written to {int8_dir}")
+
+    if onnx:
+        try:
+            import optimum.onnxruntime as ort
+        except ImportError:
+            print("❌ WARNING: optimum[onnxruntime] not installed, skipping ONNX variant")
+        else:
+            onnx_dir = target / "onnx"
+            ort_cls = getattr(ort, ONNX_CLASSES[spec["model_class"]])
+            ort_cls.from_pretrained(safetensors_dir, export=True).save_pretrained(onnx_dir)
+            tokenizer.save_pretrained(onnx_dir)
+            variants["onnx"] = {"path": str(onnx_dir.relative_to(target.parent))}
+            print(f"✅ ONNX variant written to {onnx_dir}")
+
+    for variant in variants.values():
+        variant["files"] = checksum_dir(target.parent / variant["path"])
+
+    return {
+        **spec,
+        "revision": getattr(model.config, "_commit_hash", None),
+        "variants": variants
+    }
+
+
+def build(service: str, out: Path, cache_dir: str, draft_model: str = None,
+          quantize: bool = False, onnx: bool = False, version: str = None) -> dict:
+    import torch
+    import transformers
+
+    specs = dict(SERVICE_MODELS[service])
+    if draft_model:
+        specs["draft"] = {"source": draft_model, "model_class": "AutoModelForCausalLM", "task": "text-generation"}
+
+    staging = out / ".staging"
+    shutil.rmtree(staging, ignore_errors=True)
+    models = {
+        name: build_model(name, spec, staging / name, cache_dir, quantize, onnx)
+        for name, spec in specs.items()
+    }
+
+    # Version is derived from content unless pinned, so identical builds share a version
+    if not version:
+        content = json.dumps({n: m["variants"] for n, m in models.items()}, sort_keys=True)
+        version = hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+
+    version_dir = out / version
+    shutil.rmtree(version_dir, ignore_errors=True)
+    os.replace(staging, version_dir)
+    for model in models.values():
+        for variant in model["variants"].values():
+            variant["path"] = f"{version}/{variant['path']}"
+
+    manifest = {
+        "service": service,
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "transformers_version": transformers.__version__,
+        "torch_version": torch.__version__,
+        "models": models
+    }
+    with open(out / "manifest.json", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"✅ Manifest for {service} version {version} written to {out / 'manifest.json'}")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--service", required=True, choices=sorted(SERVICE_MODELS))
+    parser.add_argument("--out", required=True, type=Path, help="artifact root, e.g. model2/artifacts")
+    parser.add_argument("--cache-dir", default="./model_cache", help="hub download cache")
+    parser.add_argument("--draft-model", help="model3 only: draft causal LM for assisted decoding")
+    parser.add_argument("--quantize", action="store_true", help="also write a dynamic int8 variant")
+    parser.add_argument("--onnx", action="store_true", help="also export ONNX (requires optimum[onnxruntime])")
+    parser.add_argument("--version", help="pin the artifact version instead of the content hash")
+    args = parser.parse_args()
+
+    if args.draft_model and args.service != "model3":
+        parser.error("--draft-model only applies to model3")
+    args.out.mkdir(parents=True, exist_ok=True)
+    build(args.service, args.out, args.cache_dir, args.draft_model, args.quantize, args.onnx, args.version)
@@ -4,14 +4,107 @@ Enhanced system for single post comment generation with rotation
 """
 
 import json
+import gzip
+import bisect
+import hashlib
 import random
+from collections import OrderedDict
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response, Query, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional
 import uvicorn
 
+try:
+    import orjson
+
+    def dump_json(obj):
+        return orjson.dumps(obj)
+except ImportError:
+    def dump_json(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+GZIP_MIN_BYTES = 1024
+MAX_PAGE_LIMIT = 500
+FILTER_CACHE_SIZE = 256
+
+
+class SerializedCollection:
+    """Read-only list snapshot served as pre-serialized JSON bytes.
+
+    Every item is encoded once when the snapshot is built, so requests only
+    join byte fragments. Equality indexes on ``index_fields`` map a value to
+    the ascending item positions holding it, which doubles as the cursor space
+    for pagination.
+    """
+
+    def __init__(self, key, items, index_fields=()):
+        self.key = key
+        self.items = items
+        self.fragments = [dump_json(item) for item in items]
+        self.indexes = {field: {} for field in index_fields}
+        for position, item in enumerate(items):
+            for field, index in self.indexes.items():
+                index.setdefault(item.get(field), []).append(position)
+        self._filtered_positions = OrderedDict()
+
+        self.body = self._wrap(self.fragments)
+        self.version = hashlib.sha1(self.body).hexdigest()[:16]
+        self.etag = f'"{self.version}"'
+        self.gzip_body = gzip.compress(self.body) if len(self.body) >= GZIP_MIN_BYTES else None
+
+    def _wrap(self, fragments, next_cursor=None, paginated=False):
+        body = b'{"' + self.key.encode('utf-8') + b'":[' + b','.join(fragments) + b']'
+        if paginated:
+            body += b',"nextCursor":' + dump_json(next_cursor)
+        return body + b'}'
+
+    def _positions(self, filters):
+        """Ascending positions matching all equality filters (LRU-memoized per matching combination)"""
+        key = tuple(sorted(filters.items()))
+        if key in self._filtered_positions:
+            self._filtered_positions.move_to_end(key)
+        else:
+            if not filters:
+                positions = list(range(len(self.items)))
+            else:
+                candidates = sorted(
+                    (self.indexes[field].get(value, []) for field, value in filters.items()),
+                    key=len
+                )
+                positions = candidates[0]
+                for other in candidates[1:]:
+                    allowed = set(other)
+                    positions = [p for p in positions if p in allowed]
+            # Query strings are client-controlled: keep only combinations that match, bounded by LRU
+            if not positions:
+                return positions
+            self._filtered_positions[key] = positions
+            if len(self._filtered_positions) > FILTER_CACHE_SIZE:
+                self._filtered_positions.popitem(last=False)
+        return self._filtered_positions[key]
+
+    def page(self, filters, cursor=None, limit=None):
+        """Return (body, etag) for a filtered page; cursor is the last position seen"""
+        positions = self._positions(filters)
+        start = 0
+        if cursor is not None:
+            try:
+                start = bisect.bisect_right(positions, int(cursor))
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        end = len(positions) if limit is None else min(start + limit, len(positions))
+        selected = positions[start:end]
+        next_cursor = str(selected[-1]) if selected and end < len(positions) else None
+        body = self._wrap([self.fragments[p] for p in selected], next_cursor, paginated=True)
+
+        query_key = repr((sorted(filters.items()), cursor, limit)).encode('utf-8')
+        etag = f'"{self.version}-{hashlib.sha1(query_key).hexdigest()[:12]}"'
+        return body, etag
+
+
 class SimpleCommentGenerator:
     def __init__(self):
         script_dir = Path(__file__).parent
@@ -33,6 +126,9 @@ class SimpleCommentGenerator:
         
         # Prepare comment variations for better diversity
         self._prepare_comment_variations()
+
+        # Pre-serialized snapshots for the listing endpoints
+        self.build_snapshots()
         
         # Debug info
         print(f"🔍 Debug Info:")
@@ -53,6 +149,13 @@ class SimpleCommentGenerator:
                 return json.load(f)
         return []
     
+    def build_snapshots(self):
+        """Serialize posts and companies once per data snapshot"""
+        self.posts_snapshot = SerializedCollection("posts", self.posts)
+        self.companies_snapshot = SerializedCollection(
+            "companies", self.companies, index_fields=("state", "businessCategoryId")
+        )
+
     def _load_all_comments(self):
         comments = {}
         comments_dir = self.data_dir / "comments"
@@ -298,13 +401,43 @@ async def generate_random():
 async def generate_specific(request: GenerateRequest):
     return generator.generate_comment(request.post_id, request.company_id)
 
+def serve_snapshot(request: Request, snapshot: SerializedCollection, filters: dict, cursor: Optional[str], limit: Optional[int]):
+    """Serve pre-serialized bytes with ETag revalidation and gzip"""
+    filters = {field: value for field, value in filters.items() if value is not None}
+    if filters or cursor is not None or limit is not None:
+        body, etag = snapshot.page(filters, cursor, limit)
+        gzip_body = None
+    else:
+        body, etag, gzip_body = snapshot.body, snapshot.etag, snapshot.gzip_body
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    if "gzip" in request.headers.get("accept-encoding", "").lower() and len(body) >= GZIP_MIN_BYTES:
+        headers["Content-Encoding"] = "gzip"
+        body = gzip_body or gzip.compress(body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @app.get("/posts")
-async def get_posts():
-    return {"posts": generator.posts}
+async def get_posts(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT)
+):
+    return serve_snapshot(request, generator.posts_snapshot, {}, cursor, limit)
 
 @app.get("/companies")
-async def get_companies():
-    return {"companies": generator.companies}
+async def get_companies(
+    request: Request,
+    state: Optional[str] = None,
+    businessCategoryId: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT)
+):
+    filters = {"state": state, "businessCategoryId": businessCategoryId}
+    return serve_snapshot(request, generator.companies_snapshot, filters, cursor, limit)
 
 if __name__ == "__main__":
     print("\n✅ AI Model Ready!")
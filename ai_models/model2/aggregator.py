@@ -0,0 +1,248 @@
+import os
+import re
+import json
+import threading
+from collections import Counter, deque
+
+# --- Stakeholder weights (mirrors model1 `_get_category_weight`) ---
+CATEGORY_WEIGHTS = {
+    'Insolvency Professional': 4.5,
+    'Insolvency Professional Agency': 4.2,
+    'Insolvency Professional Entity': 4.0,
+    'Corporate Debtor': 3.8,
+    'Creditor to a Corporate Debtor': 3.5,
+    'Personal Guarantor to a Corporate Debtor': 3.2,
+    'Academics': 3.0,
+    'Partnership firms': 2.8,
+    'Proprietorship firms': 2.5,
+    'Investors': 2.2,
+    'User': 1.8,
+    'Others': 1.5,
+    'General': 1.0
+}
+
+# Business category names seeded by the backend (prisma/seed.ts) that differ from the table above
+CATEGORY_ALIASES = {
+    'Personal Guarantor': 'Personal Guarantor to a Corporate Debtor'
+}
+
+# Recent comment ids remembered per post; backend retries of a step land well inside this window
+DEDUPE_WINDOW = 1000
+
+SENTIMENT_SIGN = {"Positive": 1.0, "Neutral": 0.0, "Negative": -1.0}
+
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'but', 'if', 'then', 'than', 'so', 'of', 'to', 'in', 'on', 'at',
+    'by', 'for', 'with', 'from', 'as', 'into', 'about', 'over', 'under', 'this', 'that', 'these',
+    'those', 'it', 'its', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'has', 'have', 'had',
+    'do', 'does', 'did', 'will', 'would', 'should', 'could', 'can', 'may', 'might', 'must', 'shall',
+    'we', 'our', 'us', 'you', 'your', 'they', 'their', 'them', 'he', 'she', 'i', 'my', 'me',
+    'not', 'no', 'also', 'such', 'which', 'who', 'what', 'how', 'very', 'more', 'most', 'all',
+    'any', 'some', 'other', 'there', 'here', 'while', 'because', 'per', 'within', 'between'
+}
+
+
+_unknown_categories = set()
+
+
+def category_weight(category: str) -> float:
+    """Relevance weight for an MCA stakeholder category."""
+    category = CATEGORY_ALIASES.get(category, category)
+    if category not in CATEGORY_WEIGHTS:
+        if category not in _unknown_categories:
+            _unknown_categories.add(category)
+            print(f"❌ WARNING: Unknown stakeholder category '{category}', using weight 1.0")
+        return 1.0
+    return CATEGORY_WEIGHTS[category]
+
+
+def extract_keyphrases(text: str) -> list[str]:
+    """Cheap keyphrase candidates: content unigrams and adjacent bigrams."""
+    tokens = [t for t in re.findall(r"[a-z][a-z\-]{2,}", text.lower()) if t not in STOPWORDS]
+    bigrams = [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    # Count each phrase once per comment so long comments don't dominate themes
+    return list(dict.fromkeys(tokens + bigrams))
+
+
+class SpaceSaving:
+    """Space-Saving heavy-hitters sketch with a fixed number of counters."""
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+
+    def add(self, item: str, weight: float = 1.0):
+        if item in self.counts:
+            self.counts[item] += weight
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[item] = weight
+            self.errors[item] = 0.0
+            return
+        victim = min(self.counts, key=self.counts.get)
+        floor = self.counts.pop(victim)
+        self.errors.pop(victim)
+        self.counts[item] = floor + weight
+        self.errors[item] = floor
+
+    def top(self, n: int) -> list[dict]:
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)[:n]
+        return [
+            {"phrase": phrase, "count": round(count, 4), "maxError": round(self.errors[phrase], 4)}
+            for phrase, count in ranked
+        ]
+
+    def to_dict(self) -> dict:
+        return {"capacity": self.capacity, "counts": dict(self.counts), "errors": dict(self.errors)}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SpaceSaving":
+        sketch = cls(data.get("capacity", 100))
+        errors = data.get("errors", {})
+        sketch.counts = {k: float(v) for k, v in data.get("counts", {}).items()}
+        sketch.errors = {k: float(errors.get(k, 0.0)) for k in sketch.counts}
+        return sketch
+
+
+class PostAggregate:
+    """Running sentiment and theme totals for one consultation post."""
+
+    def __init__(self, sketch_capacity: int = 100):
+        self.total_comments = 0
+        self.total_weight = 0.0
+        self.sentiment_counts = Counter()
+        self.weighted_sentiment = Counter()
+        self.weighted_score_sum = 0.0
+        self.language_counts = Counter()
+        self.keyphrases = SpaceSaving(sketch_capacity)
+        # Recently folded-in comment ids, oldest first; the backend retries /analyze for the same comment
+        self.recent_comment_ids = deque()
+        self.seen_comment_ids = set()
+
+    def add(self, sentiment: str, sentiment_score: float, weight: float, language_type: str, text: str,
+            comment_id: str = None) -> bool:
+        """Fold one analyzed comment in; returns False if comment_id was already counted."""
+        if comment_id is not None:
+            if comment_id in self.seen_comment_ids:
+                return False
+            self._remember(comment_id)
+        self.total_comments += 1
+        self.total_weight += weight
+        self.sentiment_counts[sentiment] += 1
+        self.weighted_sentiment[sentiment] += weight
+        self.weighted_score_sum += weight * SENTIMENT_SIGN.get(sentiment, 0.0) * sentiment_score
+        self.language_counts[language_type] += 1
+        for phrase in extract_keyphrases(text):
+            self.keyphrases.add(phrase, weight)
+        return True
+
+    def _remember(self, comment_id: str):
+        self.recent_comment_ids.append(comment_id)
+        self.seen_comment_ids.add(comment_id)
+        if len(self.recent_comment_ids) > DEDUPE_WINDOW:
+            self.seen_comment_ids.discard(self.recent_comment_ids.popleft())
+
+    def to_response(self, top_n: int = 10) -> dict:
+        total_weight = self.total_weight or 1.0
+        return {
+            "totalComments": self.total_comments,
+            "totalWeight": round(self.total_weight, 4),
+            "sentimentCounts": dict(self.sentiment_counts),
+            "weightedSentiment": {k: round(v / total_weight, 4) for k, v in self.weighted_sentiment.items()},
+            "weightedScore": round(self.weighted_score_sum / total_weight, 4),
+            "languages": dict(self.language_counts),
+            "topKeyphrases": self.keyphrases.top(top_n)
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "total_comments": self.total_comments,
+            "total_weight": self.total_weight,
+            "sentiment_counts": dict(self.sentiment_counts),
+            "weighted_sentiment": dict(self.weighted_sentiment),
+            "weighted_score_sum": self.weighted_score_sum,
+            "language_counts": dict(self.language_counts),
+            "keyphrases": self.keyphrases.to_dict(),
+            "recent_comment_ids": list(self.recent_comment_ids)
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PostAggregate":
+        aggregate = cls()
+        aggregate.total_comments = data.get("total_comments", 0)
+        aggregate.total_weight = data.get("total_weight", 0.0)
+        aggregate.sentiment_counts = Counter(data.get("sentiment_counts", {}))
+        aggregate.weighted_sentiment = Counter(data.get("weighted_sentiment", {}))
+        aggregate.weighted_score_sum = data.get("weighted_score_sum", 0.0)
+        aggregate.language_counts = Counter(data.get("language_counts", {}))
+        aggregate.keyphrases = SpaceSaving.from_dict(data.get("keyphrases", {}))
+        for comment_id in data.get("recent_comment_ids", [])[-DEDUPE_WINDOW:]:
+            aggregate._remember(comment_id)
+        return aggregate
+
+
+class AggregateIndex:
+    """Per-post aggregates updated on every analysis, with JSON snapshot/restore."""
+
+    def __init__(self, snapshot_path: str, snapshot_every: int = 25):
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+        self.posts = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        # Serializes snapshot writers so an older copy never replaces a newer one
+        self._write_lock = threading.Lock()
+
+    def record(self, post_id: str, sentiment: str, sentiment_score: float,
+               category: str, language_type: str, text: str, comment_id: str = None) -> bool:
+        with self._lock:
+            aggregate = self.posts.setdefault(post_id, PostAggregate())
+            if not aggregate.add(sentiment, sentiment_score, category_weight(category), language_type, text, comment_id):
+                return False
+            self._pending += 1
+            due = self._pending >= self.snapshot_every
+        if due:
+            self.snapshot()
+        return True
+
+    def get(self, post_id: str, top_n: int = 10):
+        with self._lock:
+            aggregate = self.posts.get(post_id)
+            return aggregate.to_response(top_n) if aggregate else None
+
+    def snapshot(self):
+        with self._write_lock:
+            # Copy under the lock, serialize and write outside it so /analyze and /aggregate don't wait on disk
+            with self._lock:
+                if not self._pending:
+                    return
+                pending, self._pending = self._pending, 0
+                data = {post_id: aggregate.to_dict() for post_id, aggregate in self.posts.items()}
+            if not self._write_snapshot(data):
+                with self._lock:
+                    self._pending += pending
+
+    def _write_snapshot(self, data: dict) -> bool:
+        tmp_path = f"{self.snapshot_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.snapshot_path)
+            return True
+        except OSError as e:
+            print(f"❌ WARNING: Could not write aggregate snapshot: {e}")
+            return False
+
+    def restore(self):
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"❌ WARNING: Could not restore aggregate snapshot: {e}")
+            return
+        with self._lock:
+            self.posts = {post_id: PostAggregate.from_dict(d) for post_id, d in data.items()}
+        print(f"✅ Restored aggregates for {len(self.posts)} post(s).")
@@ -1,12 +1,24 @@
 import os
+import sys
 import json
 import torch
-import re
+import time
+import atexit
+from pathlib import Path
 from flask import Flask, request, jsonify
+try:
+    import model_artifacts as artifacts
+except ImportError:
+    # Source-tree run: the shared loader lives in ai_models/ (images copy it next to the app)
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    import model_artifacts as artifacts
+artifacts.enable_offline()
 from transformers import pipeline as hf_pipeline
 from deep_translator import GoogleTranslator
-from langdetect import detect
 from google.cloud import translate_v2 as translate
+from aggregator import AggregateIndex
+from router import SummaryRouter
+from language import classify_language
 
 # --- 1. CONFIGURATION & SETUP ---
 
@@ -19,8 +31,8 @@ except Exception as e:
     print(f"❌ WARNING: Could not initialize Google Cloud Translate client: {e}")
     translate_client = None
 
-MODEL_CACHE_DIR = "./model_cache"
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+AGGREGATE_SNAPSHOT_PATH = os.environ.get("AGGREGATE_SNAPSHOT_PATH", "./aggregate_snapshot.json")
 
 
 # --- 2. MODEL & DATA LOADING ---
@@ -28,20 +40,31 @@ DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
 def load_models():
     """Loads all AI models and returns them in a dictionary."""
     print("--- Loading AI Models ---")
+    start = time.perf_counter()
     models = {
         "summarizer": None,
         "sentiment_model": None,
-        "label_mapping": {}
+        "label_mapping": {},
+        "artifact_version": None
     }
+
+    try:
+        manifest = artifacts.load_manifest()
+        models["artifact_version"] = manifest["version"]
+        print(f"Using model artifacts version {manifest['version']} ({artifacts.ARTIFACT_VARIANT})")
+    except Exception as e:
+        print(f"❌ ERROR: Could not load artifact manifest: {e}")
+        return models
     
     # Load Summarizer (FLAN-T5)
     try:
         print(f"Loading Summarizer on device: {DEVICE}")
+        model, tokenizer = artifacts.load_model(manifest, "summarizer")
         models["summarizer"] = hf_pipeline(
-            "text2text-generation",
-            model="google/flan-t5-base",
-            device=0 if DEVICE == "cuda" else -1,
-            model_kwargs={"cache_dir": MODEL_CACHE_DIR}
+            manifest["models"]["summarizer"]["task"],
+            model=model,
+            tokenizer=tokenizer,
+            device=0 if DEVICE == "cuda" else -1
         )
         print("✅ Summarizer loaded successfully.")
     except Exception as e:
@@ -50,16 +73,19 @@ def load_models():
     # Load Sentiment Analyzer (RoBERTa)
     try:
         print("Loading Sentiment Analyzer...")
+        model, tokenizer = artifacts.load_model(manifest, "sentiment")
         models["sentiment_model"] = hf_pipeline(
-            "sentiment-analysis", 
-            model="cardiffnlp/twitter-roberta-base-sentiment"
+            manifest["models"]["sentiment"]["task"],
+            model=model,
+            tokenizer=tokenizer,
+            device=0 if DEVICE == "cuda" else -1
         )
         models["label_mapping"] = {"LABEL_0": "Negative", "LABEL_1": "Neutral", "LABEL_2": "Positive"}
         print("✅ Sentiment Analyzer loaded successfully.")
     except Exception as e:
         print(f"❌ ERROR: Could not load sentiment model: {e}")
         
-    print("--- Model loading complete ---")
+    print(f"--- Model loading complete in {time.perf_counter() - start:.2f}s (artifacts {manifest['version']}) ---")
     return models
 
 def load_draft_context():
@@ -83,61 +109,9 @@ def translate_text(text: str) -> tuple[str, str]:
     if not text or not text.strip():
         return ("", "Empty")
 
-    try:
-        lang = detect(text)
-    except Exception:
-        lang = "en"  # Default to English if detection fails
-
-    # Enhanced Hindi/Hinglish word detection with comprehensive word list
-    hindi_words = [
-        # Common Hindi words
-        'hai', 'hain', 'ke', 'ki', 'ka', 'ko', 'se', 'mein', 'par', 'aur', 
-        'yeh', 'woh', 'kya', 'kaise', 'jo', 'bhi', 'liye', 'kuch', 'sab', 
-        'log', 'kaam', 'achha', 'bura', 'theek', 'nahi', 'haan', 'mai', 
-        'tum', 'hum', 'aise', 'waise', 'kab', 'kaha', 'kyun', 'matlab',
-        # Hinglish specific words and phrases
-        'yaar', 'bhai', 'dude', 'bilkul', 'sabse', 'zyada', 'kam', 'bahut', 
-        'thoda', 'bohat', 'actually', 'seriously', 'basically', 'obviously',
-        # Common Hinglish patterns
-        'kar', 'karna', 'karte', 'kiya', 'kiye', 'dekh', 'dekha', 'dekhe',
-        'bol', 'bola', 'bole', 'sun', 'suna', 'sune', 'lagta', 'laga', 'lage',
-        # Mixed expressions
-        'itna', 'utna', 'jitna', 'kitna', 'abhi', 'phir', 'fir', 'tab',
-        'jab', 'agar', 'lekin', 'magar', 'isliye', 'isiliye', 'waisa', 'jaisa'
-    ]
-    
-    text_lower = text.lower()
-    hindi_word_count = sum(1 for word in hindi_words if re.search(r'\b' + re.escape(word) + r'\b', text_lower))
-    
-    # Check for Devanagari script (pure Hindi)
-    has_devanagari = bool(re.search(r'[\u0900-\u097F]', text))
-    
-    # Check for English words to detect mixing
-    english_pattern = r'\b[a-zA-Z]{3,}\b'
-    english_words = len(re.findall(english_pattern, text))
-    total_words = len(text.split())
-    
-    # Improved language classification logic
-    if lang == "en" and hindi_word_count == 0 and not has_devanagari:
-        language_type = "English"
-        print(f"Detected: Pure English")
+    language_type = classify_language(text)
+    if language_type == "English":
         return (text, language_type)
-    
-    elif has_devanagari and hindi_word_count >= 1 and english_words <= total_words * 0.3:
-        language_type = "Hindi"
-        print(f"Detected: Pure Hindi (Devanagari: {has_devanagari}, Hindi words: {hindi_word_count})")
-    
-    elif (hindi_word_count >= 2 and english_words >= 1) or (lang == "en" and hindi_word_count >= 2):
-        language_type = "Hinglish"
-        print(f"Detected: Hinglish (Hindi words: {hindi_word_count}, English words: {english_words})")
-    
-    elif lang == "hi" or hindi_word_count >= 3:
-        language_type = "Hindi"
-        print(f"Detected: Hindi (langdetect: {lang}, Hindi words: {hindi_word_count})")
-    
-    else:
-        language_type = lang.upper()
-        print(f"Detected: Other language ({lang})")
 
     # Translation logic based on language type
     print(f"Language Type: {language_type}. Starting translation...")
@@ -231,6 +205,10 @@ def analyze_sentiment(text: str):
 app = Flask(__name__)
 MODELS = load_models()
 DRAFT_CONTEXT = load_draft_context()
+AGGREGATES = AggregateIndex(AGGREGATE_SNAPSHOT_PATH)
+AGGREGATES.restore()
+atexit.register(AGGREGATES.snapshot)
+SUMMARY_ROUTER = SummaryRouter()
 
 @app.route("/analyze", methods=["POST"])
 def analyze():
@@ -245,7 +223,22 @@ def analyze():
         
         translated_comment, language_type = translate_text(comment)
         sentiment, sentiment_score = analyze_sentiment(translated_comment)
-        summary = generate_summary(translated_comment)
+        summary, summary_model, route_reason = SUMMARY_ROUTER.summarize(
+            translated_comment, language_type, generate_summary
+        )
+
+        # Fold the result into the post's running aggregate when the caller says which post it belongs to
+        post_id = data.get("postId")
+        if post_id and sentiment != "Unknown":
+            AGGREGATES.record(
+                post_id,
+                sentiment,
+                sentiment_score,
+                data.get("category") or "General",
+                language_type,
+                translated_comment,
+                comment_id=data.get("commentId")
+            )
 
         return jsonify({
             "success": True,
@@ -254,7 +247,9 @@ def analyze():
             "language_type": language_type,
             "sentiment": sentiment,
             "sentimentScore": round(sentiment_score, 4),
-            "summary": summary
+            "summary": summary,
+            "summaryModel": summary_model,
+            "summaryRoute": route_reason
         })
     
     except Exception as e:
@@ -263,6 +258,22 @@ def analyze():
         traceback.print_exc()
         return jsonify({"success": False, "error": "An unhandled internal server error occurred."}), 500
 
+@app.route("/aggregate/<post_id>", methods=["GET"])
+def get_aggregate(post_id):
+    try:
+        top_n = min(max(int(request.args.get("top", 10)), 1), 50)
+    except ValueError:
+        return jsonify({"success": False, "error": "Invalid 'top' parameter"}), 400
+
+    aggregate = AGGREGATES.get(post_id, top_n)
+    if aggregate is None:
+        return jsonify({"success": False, "error": "No analyzed comments for this post"}), 404
+    return jsonify({"success": True, "postId": post_id, **aggregate})
+
+@app.route("/router/stats", methods=["GET"])
+def router_stats():
+    return jsonify({"success": True, **SUMMARY_ROUTER.snapshot()})
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))  
     app.run(debug=True, host='0.0.0.0', port=port)
\ No newline at end of file
@@ -0,0 +1,182 @@
+import os
+import time
+import threading
+from collections import Counter, deque
+
+import requests
+
+FLAN = "flan-t5-base"
+TINYLLAMA = "tinyllama-1.1b"
+SLO_WINDOW = 5  # recent TinyLlama samples judged against the SLO
+
+
+class RouterConfig:
+    """Routing thresholds, overridable through SUMMARY_ROUTER_* environment variables."""
+
+    def __init__(self):
+        self.model3_url = os.environ.get("MODEL3_API_URL", "").rstrip("/")
+        # Assumption: past this length TinyLlama summarizes better. FLAN-T5 was trained on 512-token inputs;
+        # the pipeline does not truncate, but quality on much longer inputs is unproven
+        self.long_comment_words = int(os.environ.get("SUMMARY_ROUTER_LONG_WORDS", "300"))
+        # Machine-translated Hinglish is noisier; hand medium-length ones to the larger model
+        self.noisy_comment_words = int(os.environ.get("SUMMARY_ROUTER_NOISY_WORDS", "120"))
+        self.noisy_languages = {"Hinglish"}
+        # Latency SLO mode: 0 disables it
+        self.latency_slo_ms = float(os.environ.get("SUMMARY_ROUTER_SLO_MS", "0"))
+        self.max_model3_queue = int(os.environ.get("SUMMARY_ROUTER_MAX_QUEUE", "2"))
+        # While latency is over the SLO, still let one TinyLlama probe through every N fallbacks or T seconds
+        self.probe_every = int(os.environ.get("SUMMARY_ROUTER_PROBE_EVERY", "10"))
+        self.probe_seconds = float(os.environ.get("SUMMARY_ROUTER_PROBE_SECONDS", "30"))
+        # Per-request cap, independent of the SLO (a median target that long summaries may exceed). The
+        # backend gives the whole /analyze call 60 s, so a stalled model3 must leave room for the FLAN-T5 fallback
+        self.model3_timeout = float(os.environ.get("SUMMARY_ROUTER_TIMEOUT", "20"))
+
+
+class LatencyProbe:
+    """Decides when a TinyLlama request may bypass the latency fallback to refresh its latency estimate."""
+
+    def __init__(self, every, seconds):
+        self.every = every
+        self.seconds = seconds
+        self.fallbacks = 0
+        self.last_attempt = None
+
+    def due(self, now):
+        if self.fallbacks >= self.every:
+            return True
+        return self.last_attempt is not None and now - self.last_attempt >= self.seconds
+
+    def observe(self, route, reason, now):
+        if route == TINYLLAMA:
+            self.fallbacks = 0
+            self.last_attempt = now
+        elif reason == "slo_latency_fallback":
+            self.fallbacks += 1
+
+
+def choose_route(word_count, language_type, config, model3_inflight=0, model3_latency_ms=None, probe_due=False):
+    """Return (route, reason): the cheapest summarizer expected to handle the comment."""
+    if not config.model3_url:
+        return FLAN, "model3_unconfigured"
+
+    if word_count > config.long_comment_words:
+        route, reason = TINYLLAMA, "long_comment"
+    elif language_type in config.noisy_languages and word_count > config.noisy_comment_words:
+        route, reason = TINYLLAMA, "noisy_translation"
+    else:
+        return FLAN, "short_comment"
+
+    if config.latency_slo_ms > 0:
+        if model3_inflight >= config.max_model3_queue:
+            return FLAN, "slo_queue_fallback"
+        if model3_latency_ms is not None and model3_latency_ms > config.latency_slo_ms:
+            # Only TinyLlama requests update its latency, so probe now and then or it never recovers
+            if probe_due:
+                return TINYLLAMA, "slo_probe"
+            return FLAN, "slo_latency_fallback"
+    return route, reason
+
+
+class RouteStats:
+    """Decision counts and recent latencies per route."""
+
+    def __init__(self, window=200, alpha=0.2):
+        self.alpha = alpha
+        self.decisions = Counter()
+        self.latencies = {FLAN: deque(maxlen=window), TINYLLAMA: deque(maxlen=window)}
+        self.ewma_ms = {}
+        self.failures = Counter()
+
+    def record(self, route, reason, latency_ms):
+        self.decisions[f"{route}:{reason}"] += 1
+        self.observe(route, latency_ms)
+
+    def observe(self, route, latency_ms):
+        """Latency sample without a decision, e.g. a failed attempt before falling back."""
+        self.latencies[route].append(latency_ms)
+        previous = self.ewma_ms.get(route)
+        self.ewma_ms[route] = latency_ms if previous is None else (1 - self.alpha) * previous + self.alpha * latency_ms
+
+    def recent_ms(self, route, n=SLO_WINDOW):
+        """Median of the last n samples: one outlier can't trip the SLO and a few fast probes clear it."""
+        recent = sorted(list(self.latencies[route])[-n:])
+        return recent[len(recent) // 2] if recent else None
+
+    def summary(self):
+        routes = {}
+        for route, samples in self.latencies.items():
+            ordered = sorted(samples)
+            routes[route] = {
+                "requests": sum(v for k, v in self.decisions.items() if k.startswith(f"{route}:")),
+                "ewmaMs": round(self.ewma_ms[route], 1) if route in self.ewma_ms else None,
+                "p50Ms": round(ordered[len(ordered) // 2], 1) if ordered else None,
+                "p95Ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1) if ordered else None
+            }
+        return {"decisions": dict(self.decisions), "failures": dict(self.failures), "routes": routes}
+
+
+class SummaryRouter:
+    """Sends each comment to FLAN-T5 (local) or TinyLlama (model3 /summarize)."""
+
+    def __init__(self, config=None):
+        self.config = config or RouterConfig()
+        self.stats = RouteStats()
+        self.probe = LatencyProbe(self.config.probe_every, self.config.probe_seconds)
+        self.model3_inflight = 0
+        self._lock = threading.Lock()
+
+    def summarize(self, text, language_type, local_summarize):
+        word_count = len(text.strip().split())
+        with self._lock:
+            now = time.monotonic()
+            route, reason = choose_route(
+                word_count,
+                language_type,
+                self.config,
+                self.model3_inflight,
+                self.stats.recent_ms(TINYLLAMA),
+                self.probe.due(now)
+            )
+            self.probe.observe(route, reason, now)
+            if route == TINYLLAMA:
+                self.model3_inflight += 1
+
+        start = time.perf_counter()
+        summary = None
+        if route == TINYLLAMA:
+            try:
+                summary = self._summarize_remote(text)
+            except Exception as e:
+                print(f"Model3 summary failed: {e}. Falling back to FLAN-T5.")
+                with self._lock:
+                    self.stats.failures[TINYLLAMA] += 1
+                    # Keep the latency signal for SLO mode, but the request is counted once, under FLAN
+                    self.stats.observe(TINYLLAMA, (time.perf_counter() - start) * 1000)
+                route, reason = FLAN, "model3_error"
+                start = time.perf_counter()
+            finally:
+                with self._lock:
+                    self.model3_inflight -= 1
+        if summary is None:
+            summary = local_summarize(text)
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.stats.record(route, reason, latency_ms)
+        return summary, route, reason
+
+    def _summarize_remote(self, text):
+        response = requests.post(
+            f"{self.config.model3_url}/summarize",
+            json={"text": text},
+            timeout=self.config.model3_timeout
+        )
+        response.raise_for_status()
+        data = response.json()
+        if not data.get("success"):
+            raise RuntimeError(data.get("error", "unknown model3 error"))
+        return data["summary"]
+
+    def snapshot(self):
+        with self._lock:
+            return {"model3Inflight": self.model3_inflight, **self.stats.summary()}
@@ -0,0 +1,190 @@
+"""
+Offline replay benchmark for the summarizer router.
+
+Replays comments through `choose_route` against a simulated FLAN-T5 worker
+and TinyLlama worker (one FIFO worker each, fed in parallel). A TinyLlama
+request that takes longer than the router timeout falls back to FLAN-T5 after
+the timeout, while model3 keeps working on it, as in the service. Service
+times come from a per-token cost model; pass measured numbers from
+/router/stats or /summarize "decoding" stats to calibrate it.
+
+The routed setup uses two workers, so it is compared with both single models
+on two workers of their own (equal capacity). All-FLAN-T5 is usually fastest;
+routing only pays off under the quality assumption behind the router: comments
+over SUMMARY_ROUTER_LONG_WORDS, or medium-length machine-translated Hinglish,
+are summarized better by TinyLlama. FLAN-T5 was trained on 512-token inputs
+and the pipeline does not truncate, so this is an assumption, not a hard
+limit; `flan_hard_comments` counts how many comments a policy leaves to
+FLAN-T5 against it.
+
+Languages are labelled with the same `classify_language` used by
+translate_text, unless an item carries its own `language_type`. Routing uses
+the word count of the text as given, i.e. assumes translation keeps length.
+
+The default replay set (router_replay.json) is the model1 comment dataset plus
+long multi-point submissions (30 consecutive dataset comments joined) and
+Hinglish comments, so every route is exercised.
+
+Usage:
+    python router_bench.py                                  # router_replay.json, burst arrival
+    python router_bench.py comments.json --rate 0.5 --slo-ms 8000
+"""
+
+import json
+import argparse
+from pathlib import Path
+
+from router import FLAN, TINYLLAMA, SLO_WINDOW, RouterConfig, LatencyProbe, choose_route
+from language import classify_language
+
+DEFAULT_DATASET = Path(__file__).parent / "router_replay.json"
+
+
+def flan_budget(words):
+    """Mirrors generate_summary token budget in this service."""
+    return 40 if words <= 50 else 80 if words <= 150 else 120
+
+
+def tinyllama_budget(words):
+    """Mirrors generate_summary token budget in model3."""
+    return 30 if words <= 50 else 60 if words <= 150 else 100 if words <= 300 else 150
+
+
+def service_ms(route, words, args):
+    input_tokens = int(words * 1.3)
+    if route == FLAN:
+        return args.flan_base_ms + args.flan_prefill_ms * (input_tokens + 80) + args.flan_decode_ms * flan_budget(words)
+    return (args.tinyllama_base_ms + args.tinyllama_prefill_ms * (input_tokens + 120)
+            + args.tinyllama_decode_ms * tinyllama_budget(words))
+
+
+def load_comments(paths):
+    comments = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for item in json.load(f):
+                text = item if isinstance(item, str) else item.get("commentText") or item.get("comment", "")
+                language = None if isinstance(item, str) else item.get("language_type")
+                comments.append((text, language or classify_language(text, verbose=False)))
+    return comments
+
+
+def prefers_tinyllama(words, language, config):
+    """The router's quality rule, without SLO fallbacks."""
+    return words > config.long_comment_words or (
+        language in config.noisy_languages and words > config.noisy_comment_words)
+
+
+def simulate(comments, policy, config, args, workers=1):
+    """Discrete-event replay; returns per-policy metrics. Single-model policies get `workers` FIFO workers."""
+    free_at = {FLAN: [0.0], TINYLLAMA: [0.0]} if policy == "routed" else {policy: [0.0] * workers}
+    tinyllama_jobs = []  # (observed_at_ms, latency_ms) not yet seen by the router
+    finished = []  # observed TinyLlama latencies, newest last
+    probe = LatencyProbe(config.probe_every, config.probe_seconds * 1000)
+    timeout_ms = config.model3_timeout * 1000
+    latencies, hard_on_flan, timeouts = [], 0, 0
+    routes, reasons = {route: 0 for route in free_at}, {}
+    interval = 1000.0 / args.rate if args.rate > 0 else 0.0
+
+    def run(route, ready, words):
+        queue = free_at[route]
+        worker = min(range(len(queue)), key=queue.__getitem__)
+        queue[worker] = max(ready, queue[worker]) + service_ms(route, words, args)
+        return queue[worker]
+
+    for i, (text, language) in enumerate(comments):
+        arrival = i * interval
+        words = len(text.split())
+        if policy == "routed":
+            # Router sees TinyLlama jobs still in flight and the median of recently finished ones
+            finished += [latency for observed, latency in tinyllama_jobs if observed <= arrival]
+            tinyllama_jobs = [job for job in tinyllama_jobs if job[0] > arrival]
+            recent = sorted(finished[-SLO_WINDOW:])
+            recent_ms = recent[len(recent) // 2] if recent else None
+            route, reason = choose_route(words, language, config, len(tinyllama_jobs), recent_ms, probe.due(arrival))
+            probe.observe(route, reason, arrival)
+        else:
+            route, reason = policy, None
+
+        finish = run(route, arrival, words)
+        if policy == "routed" and route == TINYLLAMA and finish - arrival > timeout_ms:
+            # Client gives up and redoes the work on FLAN-T5; model3 stays busy until `finish` regardless
+            timeouts += 1
+            tinyllama_jobs.append((arrival + timeout_ms, timeout_ms))
+            route, reason = FLAN, "model3_error"
+            finish = run(FLAN, arrival + timeout_ms, words)
+        elif route == TINYLLAMA and policy == "routed":
+            tinyllama_jobs.append((finish, finish - arrival))
+
+        latencies.append(finish - arrival)
+        routes[route] += 1
+        if reason:
+            reasons[reason] = reasons.get(reason, 0) + 1
+        if route == FLAN and prefers_tinyllama(words, language, config):
+            hard_on_flan += 1
+
+    makespan = max(max(queue) for queue in free_at.values())
+    ordered = sorted(latencies)
+    metrics = {
+        "routes": routes,
+        "makespan_s": round(makespan / 1000, 2),
+        "throughput_per_s": round(len(comments) / (makespan / 1000), 3) if makespan else None,
+        "p50_latency_s": round(ordered[len(ordered) // 2] / 1000, 2),
+        "p95_latency_s": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] / 1000, 2),
+        "flan_hard_comments": hard_on_flan
+    }
+    if policy == "routed":
+        metrics["model3_timeouts"] = timeouts
+        metrics["reasons"] = reasons
+    return metrics
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", type=Path, default=[DEFAULT_DATASET],
+                        help="JSON lists of strings or objects with commentText/comment (+ optional language_type)")
+    parser.add_argument("--rate", type=float, default=0.0, help="arrivals per second (0 = all at once)")
+    parser.add_argument("--slo-ms", type=float, default=None, help="enable latency-SLO mode with this target")
+    parser.add_argument("--max-queue", type=int, default=None, help="TinyLlama in-flight limit in SLO mode")
+    parser.add_argument("--timeout-s", type=float, default=None, help="model3 request timeout (SUMMARY_ROUTER_TIMEOUT)")
+    # Rough CPU cost model (ms); calibrate against measured stats
+    parser.add_argument("--flan-base-ms", type=float, default=30.0)
+    parser.add_argument("--flan-prefill-ms", type=float, default=0.5)
+    parser.add_argument("--flan-decode-ms", type=float, default=20.0)
+    parser.add_argument("--tinyllama-base-ms", type=float, default=80.0)
+    parser.add_argument("--tinyllama-prefill-ms", type=float, default=2.0)
+    parser.add_argument("--tinyllama-decode-ms", type=float, default=85.0)
+    args = parser.parse_args()
+
+    config = RouterConfig()
+    config.model3_url = config.model3_url or "offline-replay"
+    if args.slo_ms is not None:
+        config.latency_slo_ms = args.slo_ms
+    if args.max_queue is not None:
+        config.max_model3_queue = args.max_queue
+    if args.timeout_s is not None:
+        config.model3_timeout = args.timeout_s
+
+    comments = load_comments(args.files)
+    languages = {}
+    for _, language in comments:
+        languages[language] = languages.get(language, 0) + 1
+    print(f"Replaying {len(comments)} comments {languages} (rate={args.rate or 'burst'}/s, "
+          f"SLO={config.latency_slo_ms or 'off'}, timeout={config.model3_timeout}s)")
+    setups = {
+        f"{FLAN} x1": (FLAN, 1), f"{TINYLLAMA} x1": (TINYLLAMA, 1),
+        f"{FLAN} x2": (FLAN, 2), f"{TINYLLAMA} x2": (TINYLLAMA, 2),
+        "routed (1+1)": ("routed", 1)
+    }
+    results = {name: simulate(comments, policy, config, args, workers) for name, (policy, workers) in setups.items()}
+    for name, metrics in results.items():
+        print(f"  {name:>20}: {metrics}")
+
+    # Equal capacity: routed uses two workers, so compare against each model on two workers
+    routed = results["routed (1+1)"]
+    for name in (f"{TINYLLAMA} x2", f"{FLAN} x2"):
+        baseline = results[name]
+        print(f"vs all-{name}: routed throughput {routed['throughput_per_s'] / baseline['throughput_per_s']:.2f}x, "
+              f"p95 {routed['p95_latency_s']}s vs {baseline['p95_latency_s']}s, "
+              f"comments left to FLAN-T5 against the quality rule {routed['flan_hard_comments']} "
+              f"vs {baseline['flan_hard_comments']}")
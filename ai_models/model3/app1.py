@@ -1,13 +1,30 @@
 import os
+import sys
 import json
+import time
 import torch
+from pathlib import Path
 from flask import Flask, request, jsonify
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
+try:
+    import model_artifacts as artifacts
+except ImportError:
+    # Source-tree run: the shared loader lives in ai_models/ (images copy it next to the app)
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    import model_artifacts as artifacts
+artifacts.enable_offline()
+from assisted import assisted_generate
 
 # Suppress TensorFlow warnings for cleaner output
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 os.environ['TRANSFORMERS_VERBOSITY'] = 'error'
 
+# Decoding configuration
+# Assisted decoding runs when the artifact manifest contains a "draft" model (build_artifacts.py --draft-model)
+USE_DRAFT = os.environ.get("SUMMARY_USE_DRAFT", "true").lower() in ("1", "true", "yes")
+DRAFT_LOOKAHEAD = int(os.environ.get("SUMMARY_DRAFT_LOOKAHEAD", "4"))
+DO_SAMPLE = os.environ.get("SUMMARY_DO_SAMPLE", "true").lower() in ("1", "true", "yes")
+TEMPERATURE = 0.7
+
 # Initialize Flask app
 app = Flask(__name__)
 
@@ -32,31 +49,45 @@ DRAFT_CONTEXT = load_draft_context()
 device = "cuda" if torch.cuda.is_available() else "cpu"
 print(f"Using device: {device}")
 
-# Load model with optimizations
-print("Loading TinyLlama model...")
-tokenizer = AutoTokenizer.from_pretrained(
-    "TinyLlama/TinyLlama-1.1B-Chat-v1.0", 
-    cache_dir="./model_cache"  # Cache locally to avoid re-downloading
-)
-
-model = AutoModelForCausalLM.from_pretrained(
-    "TinyLlama/TinyLlama-1.1B-Chat-v1.0", 
+# Load model with optimizations from the prebuilt artifacts (no hub lookups)
+load_start = time.perf_counter()
+MANIFEST = artifacts.load_manifest()
+MODEL_NAME = MANIFEST["models"]["summarizer"]["source"]
+print(f"Loading TinyLlama model (artifacts {MANIFEST['version']}, {artifacts.ARTIFACT_VARIANT})...")
+model, tokenizer = artifacts.load_model(
+    MANIFEST,
+    "summarizer",
     device_map="auto",  # Let accelerate handle device mapping
     dtype=torch.float16 if device == "cuda" else torch.float32,
-    cache_dir="./model_cache",
     low_cpu_mem_usage=True  # Reduce memory usage during loading
 )
 
-# Create optimized pipeline - don't specify device when using accelerate
-summarizer = pipeline(
-    "text-generation",
-    model=model,
-    tokenizer=tokenizer
-    # Removed device parameter - accelerate handles this automatically
-)
-
 print("Model loaded successfully!")
 
+# Optional draft model for assisted decoding
+draft_model = None
+DRAFT_MODEL_NAME = MANIFEST["models"].get("draft", {}).get("source", "")
+if USE_DRAFT and DRAFT_MODEL_NAME:
+    try:
+        print(f"Loading draft model {DRAFT_MODEL_NAME} (lookahead={DRAFT_LOOKAHEAD})...")
+        draft_model, _ = artifacts.load_model(
+            MANIFEST,
+            "draft",
+            dtype=model.dtype,
+            low_cpu_mem_usage=True
+        )
+        draft_model = draft_model.to(model.device)
+        if draft_model.config.vocab_size != model.config.vocab_size:
+            print("WARNING: Draft model vocabulary differs from TinyLlama, assisted decoding disabled")
+            draft_model = None
+        else:
+            print("Draft model loaded successfully!")
+    except Exception as e:
+        print(f"WARNING: Could not load draft model, using plain decoding: {e}")
+        draft_model = None
+
+print(f"Startup model load took {time.perf_counter() - load_start:.2f}s (artifacts {MANIFEST['version']})")
+
 def generate_summary(text):
     """Optimized summary generation function for MCA eConsultation platform with adaptive length"""
     
@@ -94,19 +125,55 @@ Analyze this comment and provide a concise summary focusing on:
 
 Summary:"""
     
-    # Generate with optimized parameters (fixed temperature=0.7, adaptive length)
-    summary = summarizer(
-        prompt, 
-        max_new_tokens=max_tokens,
-        temperature=0.7,  # Fixed temperature for consistent results
-        return_full_text=False,
-        do_sample=True,
-        pad_token_id=tokenizer.eos_token_id if tokenizer.pad_token_id is None else tokenizer.pad_token_id,
-        num_return_sequences=1,
+    inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
+    prompt_len = inputs.input_ids.shape[1]
+
+    # Draft model present: speculative loop (greedy or rejection sampling) with acceptance statistics
+    if draft_model is not None:
+        output_ids, stats = assisted_generate(
+            model,
+            draft_model,
+            inputs.input_ids,
+            max_new_tokens=max_tokens,
+            lookahead=DRAFT_LOOKAHEAD,
+            eos_token_id=tokenizer.eos_token_id,
+            do_sample=DO_SAMPLE,
+            temperature=TEMPERATURE
+        )
+        decoding = {
+            "mode": "assisted_sampling" if DO_SAMPLE else "assisted_greedy",
+            "draft_model": DRAFT_MODEL_NAME,
+            **stats.as_dict()
+        }
+    else:
+        # Generate with optimized parameters (sampling at TEMPERATURE or greedy, adaptive length)
+        generation_kwargs = {"do_sample": DO_SAMPLE}
+        if DO_SAMPLE:
+            generation_kwargs["temperature"] = TEMPERATURE
+        start = time.perf_counter()
+        with torch.inference_mode():
+            output_ids = model.generate(
+                **inputs,
+                max_new_tokens=max_tokens,
+                pad_token_id=tokenizer.eos_token_id if tokenizer.pad_token_id is None else tokenizer.pad_token_id,
+                **generation_kwargs
+            )
+        seconds = time.perf_counter() - start
+        new_tokens = output_ids.shape[1] - prompt_len  # tokens actually generated, including EOS
+        decoding = {
+            "mode": "sampling" if DO_SAMPLE else "greedy",
+            "new_tokens": new_tokens,
+            "acceptance_rate": None,  # no draft model: nothing to accept
+            "tokens_per_sec": round(new_tokens / seconds, 2) if seconds else None,
+            "seconds": round(seconds, 3)
+        }
+
+    summary_text = tokenizer.decode(
+        output_ids[0, prompt_len:],
+        skip_special_tokens=True,
         clean_up_tokenization_spaces=True  # Clean up output
     )
-    
-    return summary[0]['generated_text'].strip()
+    return summary_text.strip(), decoding
 
 @app.route('/summarize', methods=['POST'])
 def summarize_text():
@@ -117,7 +184,11 @@ def summarize_text():
         "text": "Stakeholder comment on draft legislation/amendments"
     }
     Note: Summary length is automatically adjusted based on comment length
-    Temperature is fixed at 0.7 for consistent results
+    Decoding samples at temperature 0.7 by default; SUMMARY_DO_SAMPLE=false switches to greedy.
+    If the artifact manifest has a draft model (and SUMMARY_USE_DRAFT is on), the same mode runs
+    as assisted decoding ("assisted_sampling" / "assisted_greedy").
+    The "decoding" field reports mode, new_tokens, tokens_per_sec and seconds; assisted modes add
+    draft_model, draft_proposed, draft_accepted, acceptance_rate and target_forwards.
     """
     try:
         # Get JSON data from request
@@ -137,7 +208,8 @@ def summarize_text():
         # Generate summary with adaptive length
         comment_word_count = len(text.strip().split())
         print(f"Processing text ({comment_word_count} words): {text[:50]}...")
-        summary = generate_summary(text)
+        summary, decoding = generate_summary(text)
+        print(f"Decoding stats: {decoding}")
         
         # Return response with adaptive summary information
         return jsonify({
@@ -146,9 +218,11 @@ def summarize_text():
             "adaptive_settings": {
                 "comment_word_count": comment_word_count,
                 "summary_length": "adaptive (30-150 tokens based on input length)",
-                "temperature": "fixed at 0.7"
+                "temperature": f"fixed at {TEMPERATURE}" if DO_SAMPLE else "greedy (sampling off)"
             },
-            "model": "TinyLlama/TinyLlama-1.1B-Chat-v1.0",
+            "decoding": decoding,
+            "model": MODEL_NAME,
+            "artifact_version": MANIFEST["version"],
             "context": {
                 "platform": "MCA eConsultation Platform - Indian Corporate Affairs",
                 "draft_topic": DRAFT_CONTEXT.get("consultation_details", {}).get("subject", "MDP consultation"),
@@ -0,0 +1,201 @@
+"""
+Assisted (speculative) decoding for the TinyLlama summarizer.
+
+A small draft causal LM proposes `lookahead` tokens and the target model scores
+all of them in one forward pass. Greedy mode keeps the longest prefix matching
+the target's own argmax plus one corrected token, so the output is the target's
+greedy continuation. Sampling mode uses speculative rejection sampling: each
+proposal is accepted with probability min(1, p/q), and a rejection resamples
+from the residual max(0, p - q), which leaves the target's sampling
+distribution unchanged.
+
+Offline self-check with tiny randomly initialized Llama models:
+    python assisted.py --selfcheck
+"""
+
+import time
+import argparse
+import torch
+
+
+class DecodeStats:
+    """Counters for one generation call."""
+
+    def __init__(self):
+        self.proposed = 0
+        self.accepted = 0
+        self.new_tokens = 0
+        self.target_forwards = 0
+        self.seconds = 0.0
+
+    def as_dict(self):
+        return {
+            "new_tokens": self.new_tokens,
+            "draft_proposed": self.proposed,
+            "draft_accepted": self.accepted,
+            "acceptance_rate": round(self.accepted / self.proposed, 4) if self.proposed else None,
+            "target_forwards": self.target_forwards,
+            "tokens_per_sec": round(self.new_tokens / self.seconds, 2) if self.seconds else None,
+            "seconds": round(self.seconds, 3)
+        }
+
+
+def _forward(model, input_ids, cache):
+    out = model(input_ids=input_ids, past_key_values=cache, use_cache=True)
+    return out.logits, out.past_key_values
+
+
+def _cache_len(cache):
+    return 0 if cache is None else cache.get_seq_length()
+
+
+@torch.inference_mode()
+def greedy_generate(model, input_ids, max_new_tokens, eos_token_id=None):
+    """Plain token-by-token greedy decoding, used as the reference path."""
+    stats = DecodeStats()
+    start = time.perf_counter()
+    ids, cache = input_ids, None
+    prompt_len = input_ids.shape[1]
+    while ids.shape[1] - prompt_len < max_new_tokens:
+        logits, cache = _forward(model, ids[:, _cache_len(cache):], cache)
+        stats.target_forwards += 1
+        next_token = logits[:, -1:].argmax(dim=-1)
+        ids = torch.cat([ids, next_token], dim=1)
+        if eos_token_id is not None and next_token.item() == eos_token_id:
+            break
+    stats.new_tokens = ids.shape[1] - prompt_len
+    stats.seconds = time.perf_counter() - start
+    return ids, stats
+
+
+@torch.inference_mode()
+def assisted_generate(model, draft_model, input_ids, max_new_tokens, lookahead=4, eos_token_id=None,
+                      do_sample=False, temperature=1.0, generator=None):
+    """
+    Greedy or sampled decoding of `model` accelerated by `draft_model` proposals.
+
+    Both models must share a tokenizer/vocabulary. Returns (ids, DecodeStats)
+    where ids includes the prompt, like `model.generate`.
+    """
+    stats = DecodeStats()
+    start = time.perf_counter()
+    ids = input_ids
+    prompt_len = input_ids.shape[1]
+    target_cache, draft_cache = None, None
+
+    while ids.shape[1] - prompt_len < max_new_tokens:
+        remaining = max_new_tokens - (ids.shape[1] - prompt_len)
+        k = max(1, min(lookahead, remaining - 1)) if remaining > 1 else 0
+
+        # Draft proposes k tokens
+        candidate = ids
+        draft_probs = []
+        for _ in range(k):
+            draft_logits, draft_cache = _forward(draft_model, candidate[:, _cache_len(draft_cache):], draft_cache)
+            if do_sample:
+                probs = torch.softmax(draft_logits[0, -1].float() / temperature, dim=-1)
+                draft_probs.append(probs)
+                next_token = torch.multinomial(probs, 1, generator=generator).view(1, 1)
+            else:
+                next_token = draft_logits[:, -1:].argmax(dim=-1)
+            candidate = torch.cat([candidate, next_token], dim=1)
+            if eos_token_id is not None and next_token.item() == eos_token_id:
+                break
+        proposals = candidate[:, ids.shape[1]:]
+        k = proposals.shape[1]
+
+        # Target scores the prompt tail plus every proposal in one pass
+        logits, target_cache = _forward(model, candidate[:, _cache_len(target_cache):], target_cache)
+        stats.target_forwards += 1
+        if do_sample:
+            target_probs = torch.softmax(logits[0, -(k + 1):].float() / temperature, dim=-1)
+            n = 0
+            for i in range(k):
+                token = proposals[0, i]
+                ratio = target_probs[i, token] / draft_probs[i][token]
+                if torch.rand((), generator=generator, device=ratio.device) >= ratio:
+                    break
+                n += 1
+            if n < k:
+                residual = (target_probs[n] - draft_probs[n]).clamp(min=0)
+                dist = residual / residual.sum() if residual.sum() > 0 else target_probs[n]
+            else:
+                dist = target_probs[k]
+            next_token = torch.multinomial(dist, 1, generator=generator).view(1, 1)
+        else:
+            predictions = logits[:, -(k + 1):].argmax(dim=-1)
+            matches = (predictions[:, :k] == proposals)[0].tolist()
+            n = matches.index(False) if False in matches else k
+            next_token = predictions[:, n:n + 1]
+        stats.proposed += k
+        stats.accepted += n
+
+        accepted = torch.cat([proposals[:, :n], next_token], dim=1)
+        if eos_token_id is not None:
+            eos_positions = (accepted[0] == eos_token_id).nonzero()
+            if len(eos_positions):
+                accepted = accepted[:, :eos_positions[0].item() + 1]
+        ids = torch.cat([ids, accepted], dim=1)
+        if eos_token_id is not None and accepted[0, -1].item() == eos_token_id:
+            break
+
+        # Drop cache entries for rejected proposals; the last token is fed next round
+        target_cache.crop(ids.shape[1] - 1)
+        if draft_cache is not None:
+            draft_cache.crop(min(_cache_len(draft_cache), ids.shape[1] - 1))
+
+    ids = ids[:, :prompt_len + max_new_tokens]
+    stats.new_tokens = ids.shape[1] - prompt_len
+    stats.seconds = time.perf_counter() - start
+    return ids, stats
+
+
+def _tiny_llama(seed, hidden_size, layers, vocab_size=256):
+    from transformers import LlamaConfig, LlamaForCausalLM
+
+    torch.manual_seed(seed)
+    config = LlamaConfig(
+        vocab_size=vocab_size,
+        hidden_size=hidden_size,
+        intermediate_size=hidden_size * 2,
+        num_hidden_layers=layers,
+        num_attention_heads=4,
+        num_key_value_heads=4,
+        max_position_embeddings=512
+    )
+    return LlamaForCausalLM(config).eval()
+
+
+def selfcheck(max_new_tokens=48, lookahead=4):
+    """Compare assisted vs plain greedy on tiny random models (no downloads)."""
+    target = _tiny_llama(seed=0, hidden_size=128, layers=4)
+    # Draft starts as a truncated copy of the target so proposals are sometimes accepted
+    draft = _tiny_llama(seed=0, hidden_size=128, layers=1)
+    draft.load_state_dict(target.state_dict(), strict=False)
+
+    prompt = torch.randint(0, 256, (1, 16), generator=torch.Generator().manual_seed(1))
+    reference, reference_stats = greedy_generate(target, prompt, max_new_tokens)
+    assisted, assisted_stats = assisted_generate(target, draft, prompt, max_new_tokens, lookahead)
+
+    print(f"greedy:   {reference_stats.as_dict()}")
+    print(f"assisted: {assisted_stats.as_dict()}")
+    if not torch.equal(reference, assisted):
+        raise SystemExit("❌ Assisted output differs from greedy output")
+    print("✅ Assisted output matches greedy decoding")
+
+    _, sampled_stats = assisted_generate(target, draft, prompt, max_new_tokens, lookahead,
+                                         do_sample=True, temperature=0.7,
+                                         generator=torch.Generator().manual_seed(2))
+    print(f"assisted sampling: {sampled_stats.as_dict()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--selfcheck", action="store_true", help="run the offline equivalence check")
+    parser.add_argument("--max-new-tokens", type=int, default=48)
+    parser.add_argument("--lookahead", type=int, default=4)
+    args = parser.parse_args()
+    if args.selfcheck:
+        selfcheck(args.max_new_tokens, args.lookahead)
+    else:
+        parser.print_help()
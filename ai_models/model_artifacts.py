@@ -0,0 +1,94 @@
+"""
+Offline model loading from the manifest written by build_artifacts.py.
+
+Shared by model2 and model3: Docker images copy this file next to the app,
+source-tree runs import it from ai_models/. Services call `enable_offline()`
+before importing `transformers` so hub access is disabled for the whole process.
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+
+ARTIFACT_DIR = Path(os.environ.get("MODEL_ARTIFACT_DIR", "./artifacts"))
+ARTIFACT_VARIANT = os.environ.get("MODEL_ARTIFACT_VARIANT", "safetensors")
+# "size" checks file sizes on startup, "full" also re-hashes every file
+ARTIFACT_VERIFY = os.environ.get("MODEL_ARTIFACT_VERIFY", "size")
+
+
+class ArtifactError(RuntimeError):
+    pass
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def enable_offline():
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+
+def load_manifest() -> dict:
+    manifest_path = ARTIFACT_DIR / "manifest.json"
+    if not manifest_path.exists():
+        raise ArtifactError(
+            f"No artifact manifest at {manifest_path}. Build one with ai_models/build_artifacts.py"
+        )
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _verify(directory: Path, files: dict):
+    for rel_path, expected in files.items():
+        path = directory / rel_path
+        if not path.exists() or path.stat().st_size != expected["size"]:
+            raise ArtifactError(f"Artifact file missing or truncated: {path}")
+        if ARTIFACT_VERIFY == "full" and sha256_file(path) != expected["sha256"]:
+            raise ArtifactError(f"Checksum mismatch for {path}")
+
+
+def load_model(manifest: dict, name: str, **model_kwargs):
+    """Return (model, tokenizer) for a manifest entry using ARTIFACT_VARIANT, from local files only."""
+    import torch
+    import transformers
+
+    entry = manifest["models"].get(name)
+    if entry is None:
+        raise ArtifactError(f"Model '{name}' not in manifest version {manifest['version']}")
+
+    model_cls = getattr(transformers, entry["model_class"])
+    base = entry["variants"]["safetensors"]
+    base_dir = ARTIFACT_DIR / base["path"]
+    _verify(base_dir, base["files"])
+    tokenizer = transformers.AutoTokenizer.from_pretrained(base_dir, local_files_only=True)
+
+    int8 = entry["variants"].get("int8")
+    if ARTIFACT_VARIANT == "int8" and not int8:
+        print(f"❌ WARNING: No int8 variant for '{name}', loading safetensors")
+    if ARTIFACT_VARIANT == "int8" and int8:
+        # Dynamic int8 quantization only has CPU kernels
+        if torch.cuda.is_available():
+            raise ArtifactError("The int8 variant is CPU-only; use MODEL_ARTIFACT_VARIANT=safetensors on CUDA")
+        if model_kwargs:
+            print(f"❌ WARNING: int8 variant ignores load options {sorted(model_kwargs)} for '{name}'")
+        int8_dir = ARTIFACT_DIR / int8["path"]
+        _verify(int8_dir, int8["files"])
+        # The weights file is a pickle, so it is always hashed, whatever MODEL_ARTIFACT_VERIFY says
+        weights_path = int8_dir / int8["weights"]
+        if sha256_file(weights_path) != int8["files"][int8["weights"]]["sha256"]:
+            raise ArtifactError(f"Checksum mismatch for {weights_path}")
+        config = transformers.AutoConfig.from_pretrained(base_dir, local_files_only=True)
+        model = model_cls.from_config(config)
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        # Quantized tensors, dtypes and tuples are all allowed by the weights-only unpickler
+        model.load_state_dict(torch.load(weights_path, weights_only=True))
+    else:
+        model = model_cls.from_pretrained(base_dir, local_files_only=True, **model_kwargs)
+
+    return model.eval(), tokenizer
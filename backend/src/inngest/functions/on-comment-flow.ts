@@ -121,7 +121,8 @@ export const processRawComments = inngest.createFunction(
             where: {
               status: "RAW",
               processingAttempts: { lt: 3 }
-            }
+            },
+            include: { businessCategory: { select: { name: true } } }
           });
         });
       } catch (err) {
@@ -141,7 +142,10 @@ export const processRawComments = inngest.createFunction(
       try {
         model2Response = await step.run(`call-model2-attempt-${comment.id}-1`, async () => {
           return await axios.post(`${process.env.MODEL2_API_URL}/analyze`, {
-            comment: comment.rawComment
+            comment: comment.rawComment,
+            commentId: comment.id,
+            postId: comment.postId,
+            category: comment.businessCategory?.name
           }, { timeout: 60000 });
         });
       } catch (err) {